@@ -1,153 +1,147 @@
+import time
+_T_START = time.perf_counter()
+
+import threading
 import streamlit as st
-import pandas as pd
-import joblib
-import plotly.graph_objects as go
-import numpy as np
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(page_title="Civil AI Master Suite", layout="wide")
 
-# Constants from your original script
-ROAD_WIDTH = 12.0
-SIDEWALK_WIDTH = 4.0
-REAR_SETBACK = 6.0
-SIDE_GAP = 5.0
-BLOCK_SIZE = 3 # Buildings per block
+# Layout constants live in site_layout.py (shared with Rhino & the exporter)
+DETAIL_WINDOW = 250.0 # Default side of the full-detail region (m)
+RATE_RCC = 7500.0
+BRAIN_PATH = "civil_ai_brain_rhino.pkl"
+LATENCY_BUDGET_MS = 20.0 # Per-row budget used to pick a trained brain profile
 
-# --- 2. LOAD BRAIN ---
+# --- 2. LOAD BRAIN (in the background) ---
+# pandas / plotly / sklearn cost seconds to import and unpickle, so they are
+# warmed on a side thread while the UI shell below is already on screen.
 @st.cache_resource
-def load_brain():
-    try:
-        return joblib.load("civil_ai_brain_rhino.pkl")
-    except:
-        return None
-brain = load_brain()
+def start_warmup():
+    state = {"brain": None, "timings": {}, "done": threading.Event()}
+
+    def _timed(label, fn):
+        t0 = time.perf_counter()
+        result = fn()
+        state["timings"][label] = time.perf_counter() - t0
+        return result
+
+    def _load_brain():
+        import joblib
+        import brain_profiles as bp
+        try:
+            return joblib.load(bp.brain_path_for_budget(LATENCY_BUDGET_MS, default=BRAIN_PATH))
+        except:
+            return None
+
+    def _run():
+        try:
+            _timed("import numpy", lambda: __import__("numpy"))
+            _timed("import pandas", lambda: __import__("pandas"))
+            _timed("import plotly", lambda: __import__("plotly.graph_objects"))
+            _timed("import engines", lambda: [__import__(m) for m in ("site_layout", "drainage_engine", "site_tiles")])
+            state["brain"] = _timed("load brain", _load_brain)
+            total = sum(state["timings"].values())
+            print(f"⏱️  Warm-up finished in {total:.2f}s: " +
+                  ", ".join(f"{k} {v:.2f}s" for k, v in state["timings"].items()))
+        finally:
+            state["done"].set()
+
+    threading.Thread(target=_run, daemon=True).start()
+    return state
+warmup = start_warmup()
 
 # --- 3. HELPER FUNCTIONS FOR 3D ---
-def get_box_mesh(x, y, z, dx, dy, dz, color):
-    """Creates a 3D box for Plotly"""
+# Plotly colour & opacity per Rhino layer
+LAYER_STYLE = {
+    "AI_Roads": ('#333333', 1.0),
+    "AI_Utility_Corridor": ('#AAAAAA', 1.0),
+    "AI_Drainage_Lat": ('cyan', 1.0),
+    "AI_Drainage_Main": ('blue', 1.0),
+    "AI_Fdn_Good": ('#2ECC40', 0.8),
+    "AI_Fdn_Bad": ('#FF4136', 0.8),
+    "AI_Buildings": ('#DDDDDD', 0.5),
+    "AI_Roof": ('#999999', 0.8),
+}
+FOOTPRINT_STYLE = {**LAYER_STYLE, "AI_Buildings": ('#BBBBBB', 0.6)}
+
+def get_mesh(verts, faces, color, opacity, name):
+    """One Plotly trace for a whole merged buffer (not one trace per box)"""
     return go.Mesh3d(
-        x=[x, x+dx, x+dx, x, x, x+dx, x+dx, x],
-        y=[y, y, y+dy, y+dy, y, y, y+dy, y+dy],
-        z=[z, z, z, z, z-dz, z-dz, z-dz, z-dz],
-        i = [7, 0, 0, 0, 4, 4, 6, 6, 4, 0, 3, 2],
-        j = [3, 4, 1, 2, 5, 6, 5, 2, 0, 1, 6, 3],
-        k = [0, 7, 2, 3, 6, 7, 1, 1, 5, 5, 7, 6],
-        color=color,
-        opacity=0.8,
-        flatshading=True,
-        name='Building'
+        x=verts[:, 0], y=verts[:, 1], z=verts[:, 2],
+        i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+        color=color, opacity=opacity, flatshading=True, name=name
     )
 
-def get_road_mesh(x, y, width, length):
-    """Creates a flat road surface"""
-    return go.Mesh3d(
-        x=[x, x+width, x+width, x],
-        y=[y, y, y+length, y+length],
-        z=[0, 0, 0, 0], # Roads are at Z=0
-        color='#333333', # Dark Grey
-        opacity=1.0
-    )
+@st.cache_resource(max_entries=4)
+def build_estate(site_w, site_d, lot_w, lot_d, base_soil, _brain):
+    """Layout, AI foundations, drainage & per-tile mesh buffers (cached per site)"""
+    layout = sl.build_site_layout(site_w, site_d, lot_w, lot_d)
+    soils = sl.assign_soils(layout, base_soil)
+    try:
+        thick = sl.predict_thickness(_brain, lot_w * lot_d, soils)
+    except:
+        thick = sl.predict_thickness(None, lot_w * lot_d, soils)
+    layers = sl.build_layers(layout, thick, de.build_drainage_network(layout))
+    return layout, thick, stl.build_tiles(layout, layers)
 
 # --- 4. UI SIDEBAR ---
 st.sidebar.title("🏗️ Civil AI Suite")
 
 # Site Settings
-site_w = st.sidebar.slider("Total Site Width (m)", 100, 500, 200)
-site_d = st.sidebar.slider("Total Site Depth (m)", 100, 500, 150)
+site_w = st.sidebar.slider("Total Site Width (m)", 100, 3000, 200)
+site_d = st.sidebar.slider("Total Site Depth (m)", 100, 3000, 150)
 
 # Lot Settings
-lot_width = st.sidebar.number_input("Lot Width", value=40.0)
-lot_depth = st.sidebar.number_input("Lot Depth", value=30.0)
+lot_width = st.sidebar.number_input("Lot Width", min_value=1.0, value=40.0)
+lot_depth = st.sidebar.number_input("Lot Depth", min_value=1.0, value=30.0)
 
 # Soil Settings
 base_soil = st.sidebar.selectbox("Base Soil", ["Murum", "Black Cotton", "Hard Rock"])
 
+# View Settings (tiles outside the region are drawn as flat footprints)
+st.sidebar.subheader("🔍 Detail Region")
+view_x = st.sidebar.slider("Region X (m)", 0, site_w, (0, min(site_w, int(DETAIL_WINDOW))))
+view_y = st.sidebar.slider("Region Y (m)", 0, site_d, (0, min(site_d, int(DETAIL_WINDOW))))
+full_detail = st.sidebar.checkbox("Full detail everywhere", value=False)
+
 # --- 5. MAIN LOGIC (The Generator) ---
 st.header("Site Master Plan Generator")
+shell_time = time.perf_counter() - _T_START
+
+# UI shell is painted; only now wait for the heavy modules
+if not warmup["done"].is_set():
+    with st.spinner("🧠 Loading AI brain & 3D engine..."):
+        warmup["done"].wait()
+import plotly.graph_objects as go
+import drainage_engine as de
+import site_layout as sl
+import site_tiles as stl
+brain = warmup["brain"]
+
+layout, thick, tiles = build_estate(float(site_w), float(site_d), lot_width, lot_depth, base_soil, brain)
+
+# --- SELECT TILES ---
+if full_detail:
+    selected = list(range(tiles['n_tiles']))
+else:
+    selected = stl.tiles_in_region(tiles, view_x[0], view_y[0], view_x[1], view_y[1])
+
+meshes = []
+for name, (verts, faces) in stl.detail_mesh(tiles, selected).items():
+    color, opacity = LAYER_STYLE[name]
+    meshes.append(get_mesh(verts, faces, color, opacity, name))
+
+for name, (verts, faces) in stl.footprint_mesh(tiles, selected).items():
+    color, opacity = FOOTPRINT_STYLE[name]
+    meshes.append(get_mesh(verts, faces, color, opacity, f"{name} (footprint)"))
 
-# Initialize Lists for Plotly
-meshes = [] # Stores buildings and roads
-lines = []  # Stores pipes
-
-# Calculate Steps
-step_x = lot_width + SIDE_GAP
-step_y = ROAD_WIDTH + SIDEWALK_WIDTH + lot_depth + REAR_SETBACK
-rows = int(site_d / step_y)
-cols = int(site_w / step_x)
-
-# --- GENERATE INFRASTRUCTURE (Main Trunk) ---
-trunk_x = -15.0
-trunk_start_y = site_d + 10
-trunk_end_y = -20
-
-# Main Sewer Line (Blue Thick Line)
-lines.append(go.Scatter3d(
-    x=[trunk_x, trunk_x], y=[trunk_start_y, trunk_end_y], z=[-4, -6],
-    mode='lines', line=dict(color='blue', width=8), name='Main Sewer Trunk'
-))
-
-# --- GENERATE GRID LOOP ---
-total_cost = 0
-concrete_vol = 0
-
-for r in range(rows):
-    block_y = r * step_y
-    road_y = block_y
-    building_y = road_y + ROAD_WIDTH + SIDEWALK_WIDTH
-    pipe_y = road_y + ROAD_WIDTH + (SIDEWALK_WIDTH/2)
-    
-    meshes.append(get_road_mesh(0, road_y, site_w, ROAD_WIDTH))
-    
-    lines.append(go.Scatter3d(
-        x=[trunk_x, site_w], y=[pipe_y, pipe_y], z=[-4, -3],
-        mode='lines', line=dict(color='cyan', width=4), name='Lateral Pipe'
-    ))
-
-    current_x = 0
-    for c in range(cols):
-        if c > 0 and c % BLOCK_SIZE == 0:
-            meshes.append(get_road_mesh(current_x, 0, ROAD_WIDTH, site_d))
-            current_x += ROAD_WIDTH
-            continue
-
-        # --- AI CALCULATION ---
-        sbc = 600 if "Rock" in base_soil else (80 if "Cotton" in base_soil else 250)
-
-        if brain:
-            try:
-                input_df = pd.DataFrame([{'Derived_Area': lot_width*lot_depth, 'SBC': sbc, 'GW_Depth': 5, 'Soil_Code': 1}])
-                pred_thick = brain['model_thick'].predict(input_df)[0] / 1000.0
-            except:
-                pred_thick = 0.5
-        else:
-            pred_thick = 1.2 if sbc < 100 else 0.4
-            
-        # Cost Calc
-        vol = lot_width * lot_depth * pred_thick
-        concrete_vol += vol
-        total_cost += (vol * 7500) # Rate RCC
-        
-        # --- DRAW BUILDING ---
-        fdn_color = '#FF4136' if pred_thick > 0.8 else '#2ECC40'
-        meshes.append(get_box_mesh(current_x, building_y, 0, lot_width, lot_depth, pred_thick, fdn_color))
-        
-        meshes.append(get_box_mesh(current_x, building_y, 0, lot_width, lot_depth, -6.0, '#AAAAAA')) # Negative Z means Up in this function logic, usually distinct
-
-        meshes.append(go.Mesh3d(
-            x=[current_x, current_x+lot_width, current_x+lot_width, current_x, current_x, current_x+lot_width, current_x+lot_width, current_x],
-            y=[building_y, building_y, building_y+lot_depth, building_y+lot_depth, building_y, building_y, building_y+lot_depth, building_y+lot_depth],
-            z=[0, 0, 0, 0, 6, 6, 6, 6], # Height 6m
-            i=[7, 0, 0, 0, 4, 4, 6, 6, 4, 0, 3, 2],
-            j=[3, 4, 1, 2, 5, 6, 5, 2, 0, 1, 6, 3],
-            k=[0, 7, 2, 3, 6, 7, 1, 1, 5, 5, 7, 6],
-            color='#DDDDDD', opacity=0.5, name='Warehouse'
-        ))
-
-        current_x += step_x
+# --- COST CALC ---
+concrete_vol = float((lot_width * lot_depth * thick).sum())
+total_cost = concrete_vol * RATE_RCC
 
 # --- 6. VISUALIZATION ---
-fig = go.Figure(data=meshes + lines)
+fig = go.Figure(data=meshes)
 
 fig.update_layout(
     scene=dict(
@@ -163,7 +157,16 @@ fig.update_layout(
 st.plotly_chart(fig, use_container_width=True)
 
 # --- 7. METRICS ---
-c1, c2, c3 = st.columns(3)
-c1.metric("Total Buildings", f"{cols * rows}")
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Total Buildings", f"{len(thick)}")
 c2.metric("Total Concrete", f"{concrete_vol:.1f} m³")
-c3.metric("Project Est. Cost", f"₹{total_cost:,.0f}")
\ No newline at end of file
+c3.metric("Project Est. Cost", f"₹{total_cost:,.0f}")
+c4.metric("Tiles in Detail", f"{len(selected)} / {tiles['n_tiles']}")
+
+# --- 8. STARTUP REPORT ---
+with st.sidebar.expander("⏱️ Startup report"):
+    st.markdown(f"**Brain profile:** {(brain or {}).get('profile', 'default')}")
+    st.markdown(f"**UI shell:** {shell_time * 1000:.0f} ms")
+    for label, secs in warmup["timings"].items():
+        st.markdown(f"**{label}:** {secs * 1000:.0f} ms")
+    st.markdown(f"**Full page:** {(time.perf_counter() - _T_START) * 1000:.0f} ms")
\ No newline at end of file
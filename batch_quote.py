@@ -0,0 +1,131 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+
+import boq_engine as boq
+
+# --- CONFIGURATION ---
+BRAIN_PATH = "civil_ai_brain_rhino.pkl"
+IN_FLIGHT_PER_WORKER = 4  # Sites queued per worker; bounds memory on huge inputs
+
+# Example input line:
+# {"site_id": "T-101", "site_w": 600, "site_d": 400, "lot_width": 40, "lot_depth": 30,
+#  "base_soil": "Murum", "zones": [{"rect": [[0, 0], [200, 150]], "soil": "Black Cotton"}],
+#  "rates": {"RATE_RCC_M25": 7800}}
+
+# --- SECTION 1: WORKERS ---
+_brain = None
+
+def _init_worker(brain_path):
+    """Each worker loads the brain once, not once per site"""
+    global _brain
+    _brain = joblib.load(brain_path) if brain_path and os.path.exists(brain_path) else None
+
+def _quote_line(args):
+    line_no, line = args
+    site_id = line_no
+    try:
+        spec = json.loads(line)
+        site_id = spec.get("site_id", line_no)
+        result = boq.quote_site(spec, _brain)
+        result["site_id"] = site_id
+    except Exception as e:
+        # Keep the spec's site_id whenever the line parsed
+        result = {"site_id": site_id, "error": f"{type(e).__name__}: {e}"}
+    return result
+
+def read_specs(path):
+    """Stream non-blank lines of a JSONL file"""
+    with open(path) as f:
+        for line_no, line in enumerate(f, start=1):
+            if line.strip():
+                yield line_no, line
+
+def quote_stream(specs, brain_path=BRAIN_PATH, workers=None):
+    """Quote specs in input order with a bounded window of in-flight sites"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(brain_path)
+        yield from map(_quote_line, specs)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(brain_path,)) as pool:
+        window = deque()
+        for item in specs:
+            window.append(pool.submit(_quote_line, item))
+            if len(window) >= workers * IN_FLIGHT_PER_WORKER:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+# --- SECTION 2: WRITERS ---
+
+def _report_failure(result):
+    print(f"⚠️  Site {result['site_id']} failed: {result['error']}")
+
+def write_jsonl(results, path):
+    """Failed sites are written as {"site_id", "error"} lines and reported; returns (ok, failed)"""
+    ok = failed = 0
+    with open(path, "w") as f:
+        for result in results:
+            if "error" in result:
+                _report_failure(result)
+                failed += 1
+            else:
+                result["design_log"] = result["design_log"].to_dataframe().to_dict("records")
+                ok += 1
+            f.write(json.dumps(result) + "\n")
+    return ok, failed
+
+def write_csv(results, prefix):
+    """<prefix>_BOQ_Cost.csv and <prefix>_Design_Log.csv, prefixed with Site_ID; returns (ok, failed)"""
+    ok = failed = 0
+    with open(f"{prefix}_BOQ_Cost.csv", "w", newline="") as f_boq, \
+         open(f"{prefix}_Design_Log.csv", "w", newline="") as f_log:
+        w_boq = csv.DictWriter(f_boq, fieldnames=["Site_ID"] + boq.BOQ_COLUMNS)
+        w_boq.writeheader()
+        f_log.write(",".join(["Site_ID"] + boq.DESIGN_COLUMNS) + "\n")
+        for result in results:
+            if "error" in result:
+                _report_failure(result)
+                failed += 1
+                continue
+            ok += 1
+            w_boq.writerows({"Site_ID": result["site_id"], **row} for row in result["boq"])
+            df_log = result["design_log"].to_dataframe()
+            df_log.insert(0, "Site_ID", result["site_id"])
+            df_log.to_csv(f_log, header=False, index=False)
+    return ok, failed
+
+# --- SECTION 3: CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch BOQ quotes for site specs in a JSONL file.")
+    parser.add_argument("specs", nargs="?", default="requests.jsonl", help="Input JSONL, one site per line")
+    parser.add_argument("--out", default="quotes.jsonl", help="Output .jsonl file, or CSV prefix with --format csv")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--brain", default=BRAIN_PATH, help="Brain .pkl (rule-of-thumb if missing)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.brain):
+        print(f"⚠️  Brain '{args.brain}' not found, using rule-of-thumb thickness.")
+
+    t0 = time.perf_counter()
+    results = quote_stream(read_specs(args.specs), args.brain, args.workers)
+    if args.format == "csv":
+        ok, failed = write_csv(results, args.out)
+    else:
+        ok, failed = write_jsonl(results, args.out)
+    print(f"✅ Quoted {ok} sites in {time.perf_counter() - t0:.1f}s -> {args.out}")
+    if failed:
+        print(f"⚠️  {failed} sites failed (see warnings above)")
+
+if __name__ == "__main__":
+    main()
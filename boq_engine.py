@@ -0,0 +1,97 @@
+import numpy as np
+
+import drainage_engine as de
+import site_layout as sl
+from lot_records import LotTable, DESIGN_SCHEMA, export_names
+
+# --- CONFIGURATION ---
+# Output schemas of scripts/3d_create.py
+BOQ_COLUMNS = ["Category", "Item", "Unit", "Rate", "Qty", "Total"]
+DESIGN_COLUMNS = export_names(DESIGN_SCHEMA)
+MAX_SPEC_M = 10000.0  # Largest site / lot dimension accepted in a spec (m)
+
+# --- SECTION 1: QUANTITIES ---
+
+def site_boq(layout, thick, network, rates=None):
+    """Raw boq_data rows for the whole site (lot items summed as arrays)"""
+    rate = {**sl.RATES, **(rates or {})}
+    lw, ld = layout['lot_w'], layout['lot_d']
+    thick = np.asarray(thick, dtype=float)
+
+    pit_vol = (lw + 2) * (ld + 2) * (thick + 0.15)
+    rcc_vol = lw * ld * thick
+    road_area = layout['step_x_build'] * sl.ROAD_WIDTH * len(thick)
+    pond_vol = 3.14 * (sl.POND_RADIUS**2) * 5.0
+
+    boq_data = de.drainage_boq(network, rates)
+    boq_data += [
+        {"Category": "Earthwork", "Item": "Pond Excavation", "Unit": "m3", "Qty": pond_vol, "Rate": rate["RATE_EXCAVATION"]},
+        {"Category": "Roads", "Item": "Asphalt Road", "Unit": "sqm", "Qty": road_area, "Rate": rate["RATE_ROAD_ASPHALT"]},
+        {"Category": "Structure", "Item": "Fdn Concrete", "Unit": "m3", "Qty": float(rcc_vol.sum()), "Rate": rate["RATE_RCC_M25"]},
+        {"Category": "Structure", "Item": "Fdn Steel", "Unit": "kg", "Qty": float(rcc_vol.sum() * sl.KG_STEEL_PER_M3), "Rate": rate["RATE_STEEL"]},
+        {"Category": "Earthwork", "Item": "Excavation", "Unit": "m3", "Qty": float(pit_vol.sum()), "Rate": rate["RATE_EXCAVATION"]},
+    ]
+    return [row for row in boq_data if row["Qty"] != 0]
+
+def summarize_boq(boq_data):
+    """Same grouping as the Rhino cost report: sum Qty per item, then Total"""
+    groups = {}
+    for row in boq_data:
+        key = (row["Category"], row["Item"], row["Unit"], row["Rate"])
+        groups[key] = groups.get(key, 0.0) + row["Qty"]
+    return [
+        {"Category": c, "Item": i, "Unit": u, "Rate": r, "Qty": q, "Total": q * r}
+        for (c, i, u, r), q in sorted(groups.items())
+    ]
+
+def design_log(layout, soils, thick):
+    """Design_Log as a LotTable, rounded exactly like the Rhino script"""
+    lw, ld = layout['lot_w'], layout['lot_d']
+    thick = np.asarray(thick, dtype=float)
+    rcc_vol = lw * ld * thick
+
+    log = LotTable(DESIGN_SCHEMA, capacity=max(len(thick), 1))
+    log.extend(
+        Row=layout['lot_row'] + 1,
+        Col=layout['lot_col'] + 1,
+        Soil_Type=soils,
+        SBC_Value=sl.sbc_for_soil(soils),
+        AI_Thickness_mm=(thick * 1000).astype(np.int64),
+        Excavation_Depth_m=np.round(thick + 0.15, 2),
+        Concrete_Vol_m3=np.round(rcc_vol, 1),
+        Steel_Req_kg=(rcc_vol * sl.KG_STEEL_PER_M3).astype(np.int64),
+    )
+    return log
+
+# --- SECTION 2: SITE QUOTE ---
+
+def _dimension(spec, key, default=None):
+    """Finite, positive, sane spec dimension (m) or ValueError"""
+    if key not in spec and default is None:
+        raise ValueError(f"'{key}' is required")
+    value = float(spec.get(key, default))
+    if not (np.isfinite(value) and 0 < value <= MAX_SPEC_M):
+        raise ValueError(f"'{key}' must be > 0 and <= {MAX_SPEC_M:g} m, got {spec.get(key)!r}")
+    return value
+
+def quote_site(spec, brain=None):
+    """Layout -> one batched prediction -> drainage -> BOQ for one site spec"""
+    site_w = _dimension(spec, "site_w")
+    site_d = _dimension(spec, "site_d")
+    lot_w = _dimension(spec, "lot_width", sl.LOT_WIDTH)
+    lot_d = _dimension(spec, "lot_depth", sl.LOT_DEPTH)
+    base_soil = spec.get("base_soil", "Murum")
+    zones = [(z["rect"], z["soil"]) for z in spec.get("zones", [])]
+
+    layout = sl.build_site_layout(site_w, site_d, lot_w, lot_d)
+    soils = sl.assign_soils(layout, base_soil, zones)
+    thick = sl.predict_thickness(brain, lot_w * lot_d, soils, spec.get("gw_depth", 5.0))
+    network = de.build_drainage_network(layout)
+
+    boq = summarize_boq(site_boq(layout, thick, network, spec.get("rates")))
+    return {
+        "lots": len(thick),
+        "total_cost": sum(row["Total"] for row in boq),
+        "boq": boq,
+        "design_log": design_log(layout, soils, thick),
+    }
@@ -0,0 +1,79 @@
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+
+# --- CONFIGURATION ---
+# Bounded forests: fewer / shallower trees trade a little R² for latency & size
+PROFILES = {
+    "fast":     {"n_estimators": 20,  "max_depth": 8,    "min_samples_leaf": 5},
+    "balanced": {"n_estimators": 50,  "max_depth": 14,   "min_samples_leaf": 2},
+    "accurate": {"n_estimators": 100, "max_depth": None, "min_samples_leaf": 1},
+}
+REPORT_PATH = "civil_ai_brain_profiles.json"
+ROW_REPEATS = 50    # Single-row predicts timed per profile
+BATCH_ROWS = 1000   # Rows in the batch-latency probe
+
+# --- SECTION 1: TRAIN & BENCHMARK ---
+
+def profile_path(name, prefix="civil_ai_brain"):
+    return f"{prefix}_{name}.pkl"
+
+def train_profile(name, X, y_cost, y_thick, random_state=42):
+    """Both 'lobes' of the brain with the profile's forest settings"""
+    params = PROFILES[name]
+    model_cost = RandomForestRegressor(random_state=random_state, **params).fit(X, y_cost)
+    model_thick = RandomForestRegressor(random_state=random_state, **params).fit(X, y_thick)
+    return {'model_cost': model_cost, 'model_thick': model_thick, 'profile': name}
+
+def benchmark_brain(brain, X_test, y_cost, y_thick):
+    """Held-out R², single-row & batch latency (model_thick) and pickle size"""
+    model = brain['model_thick']
+    row = X_test.iloc[[0]]
+    model.predict(row)  # Warm up
+
+    times = []
+    for _ in range(ROW_REPEATS):
+        t0 = time.perf_counter()
+        model.predict(row)
+        times.append(time.perf_counter() - t0)
+
+    batch = X_test.sample(BATCH_ROWS, replace=True, random_state=0)
+    t0 = time.perf_counter()
+    model.predict(batch)
+    batch_time = time.perf_counter() - t0
+
+    return {
+        # Unrounded: near-perfect profiles must still be ranked by accuracy
+        "r2_thick": float(r2_score(y_thick, model.predict(X_test))),
+        "r2_cost": float(r2_score(y_cost, brain["model_cost"].predict(X_test))),
+        "row_ms": round(float(np.median(times)) * 1000, 3),
+        "batch_1k_ms": round(batch_time * 1000, 3),
+        "pickle_kb": round(len(pickle.dumps(brain)) / 1024, 1),
+    }
+
+# --- SECTION 2: CHOOSING A PROFILE ---
+
+def load_report(report_path=REPORT_PATH):
+    with open(report_path) as f:
+        return json.load(f)
+
+def choose_profile(budget_ms, report):
+    """Most accurate profile within the single-row budget (R² ties -> faster; none fit -> fastest)"""
+    fits = [p for p in report["profiles"] if p["row_ms"] <= budget_ms]
+    if not fits:
+        return min(report["profiles"], key=lambda p: p["row_ms"])["name"]
+    return max(fits, key=lambda p: (p["r2_thick"], -p["row_ms"]))["name"]
+
+def brain_path_for_budget(budget_ms, report_path=REPORT_PATH, default=None):
+    """Brain file to load for a latency budget; default if no profiles were trained"""
+    if not os.path.exists(report_path):
+        return default
+    report = load_report(report_path)
+    name = choose_profile(budget_ms, report)
+    path = next(p["path"] for p in report["profiles"] if p["name"] == name)
+    return os.path.join(os.path.dirname(report_path), path)
@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+BRAIN_PATH = "civil_ai_brain_rhino.pkl"
+HOST = "127.0.0.1"        # Local only
+PORT = 8765
+BATCH_WINDOW_MS = 5.0     # How long the first request waits for company
+MAX_BATCH = 512
+FEATURES = ['Derived_Area', 'SBC', 'GW_Depth', 'Soil_Code']
+LATENCY_SAMPLES = 10000
+
+# --- SECTION 1: MICRO-BATCHER ---
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predicts into one forest call"""
+
+    def __init__(self, model, features, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.model = model
+        self.features = list(getattr(model, "feature_names_in_", features))
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.batch_sizes = deque(maxlen=LATENCY_SAMPLES)
+        self.rows_total = 0
+        self.batches_total = 0
+        self.batches_failed = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, row):
+        """Convert up front so a bad row fails alone, never the batch it would join"""
+        values = [float(row[f]) for f in self.features]
+        fut = Future()
+        self.queue.put((time.perf_counter(), values, fut))
+        return fut
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._predict(batch)
+
+    def _predict(self, batch):
+        try:
+            X = pd.DataFrame([row for _, row, _ in batch], columns=self.features)
+            preds = self.model.predict(X).tolist()
+        except Exception:
+            with self.lock:
+                self.batches_failed += 1
+            # Retry row by row so only the offending request(s) fail
+            for item in batch:
+                self._predict_one(item)
+            return
+
+        done = time.perf_counter()
+        for (t0, _, fut), pred in zip(batch, preds):
+            fut.set_result(pred)
+        with self.lock:
+            self.latencies.extend(done - t0 for t0, _, _ in batch)
+            self.batch_sizes.append(len(batch))
+            self.rows_total += len(batch)
+            self.batches_total += 1
+
+    def _predict_one(self, item):
+        t0, row, fut = item
+        try:
+            pred = float(self.model.predict(pd.DataFrame([row], columns=self.features))[0])
+        except Exception as e:
+            fut.set_exception(e)
+            return
+        fut.set_result(pred)
+        with self.lock:
+            self.latencies.append(time.perf_counter() - t0)
+            self.batch_sizes.append(1)
+            self.rows_total += 1
+            self.batches_total += 1
+
+    def metrics(self):
+        with self.lock:
+            lat = np.array(self.latencies) * 1000.0
+            sizes = np.array(self.batch_sizes)
+            out = {"rows": self.rows_total, "batches": self.batches_total,
+                   "batches_failed": self.batches_failed}
+        if len(lat):
+            out["latency_ms"] = {f"p{p}": round(float(np.percentile(lat, p)), 3) for p in (50, 95, 99)}
+            out["batch_size"] = {"mean": round(float(sizes.mean()), 2), "max": int(sizes.max())}
+        return out
+
+# --- SECTION 2: HTTP SERVICE ---
+
+class BrainHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # Default backlog of 5 resets bursts of planners
+
+def make_server(brain, host=HOST, port=PORT, window_ms=BATCH_WINDOW_MS):
+    """One brain in memory, one batcher per model ('thick', 'cost')"""
+    batchers = {
+        key.replace("model_", ""): MicroBatcher(model, FEATURES, window_ms)
+        for key, model in brain.items() if key.startswith("model_")
+    }
+    soil_map = brain.get('soil_map', {})
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "models": sorted(batchers)})
+            elif self.path == "/metrics":
+                self._send(200, {name: b.metrics() for name, b in batchers.items()})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            # POST /predict/<model>  {"Derived_Area": .., "SBC": .., "GW_Depth": .., "Soil_Type" | "Soil_Code": ..}
+            name = self.path.rstrip("/").rsplit("/", 1)[-1]
+            if not self.path.startswith("/predict/") or name not in batchers:
+                self._send(404, {"error": f"unknown model, use one of {sorted(batchers)}"})
+                return
+            try:
+                row = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if not isinstance(row, dict):
+                    raise ValueError("body must be a JSON object")
+                if "Soil_Code" not in row:
+                    row["Soil_Code"] = soil_map.get(row.get("Soil_Type"), 0)
+                fut = batchers[name].submit(row)
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": f"{type(e).__name__}: {e}"})
+                return
+            try:
+                pred = fut.result()
+            except (ValueError, KeyError) as e:
+                self._send(400, {"error": f"{type(e).__name__}: {e}"})
+                return
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            self._send(200, {"prediction": pred})
+
+        def log_message(self, *args):
+            pass  # Keep the console quiet under load
+
+    return BrainHTTPServer((host, port), Handler)
+
+# --- SECTION 3: CLIENT ---
+
+def predict_remote(row, model="thick", url=f"http://{HOST}:{PORT}", timeout=5.0):
+    """Single-row predict against a running brain_server"""
+    req = urllib.request.Request(f"{url}/predict/{model}", data=json.dumps(row).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())["prediction"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Local micro-batching prediction server for the Civil AI brain.")
+    parser.add_argument("--brain", default=BRAIN_PATH)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS, help="Micro-batch window")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.brain):
+        print(f"❌ Brain '{args.brain}' not found.")
+        return
+    server = make_server(joblib.load(args.brain), HOST, args.port, args.window_ms)
+    print(f"🧠 Brain server on http://{HOST}:{args.port}  (POST /predict/thick | /predict/cost, GET /metrics)")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
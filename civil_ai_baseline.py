@@ -1,7 +1,7 @@
 import matplotlib.pyplot as plt
 from shapely.geometry import Polygon
 import random
-import pandas as pd
+from lot_records import LotTable, MASTER_SCHEMA
 
 # --- SECTION 1: HELPER FUNCTIONS (Physics & Math) ---
 
@@ -90,7 +90,7 @@ def add_drainage_system(total_w, total_d, road_w):
     return pond, main_drain
 
 # --- SECTION 3: DATA FACTORY EXECUTION ---
-master_dataset = []
+master_dataset = LotTable(MASTER_SCHEMA)
 print("🚀 Starting Data Factory Generation...")
 
 for scenario in range(50):
@@ -124,15 +124,15 @@ for scenario in range(50):
         costs = estimate_materials(area, thick, p_length)
         
         # Save Data
-        master_dataset.append({
-            "Scenario_ID": scenario,
-            "Site_Size": f"{s_width}x{s_depth}",
+        master_dataset.append(
+            Scenario_ID=scenario,
+            Site_Size=f"{s_width}x{s_depth}",
             **physics, **adv_phys, **costs,
-            "Found_Type": found_type, "Slab_Thickness_mm": thick
-        })
+            Found_Type=found_type, Slab_Thickness_mm=thick
+        )
 
 # --- SECTION 4: EXPORT & VISUALIZATION ---
-df = pd.DataFrame(master_dataset)
+df = master_dataset.to_dataframe()
 df.to_csv("pune_civil_ai_master_data.csv", index=False)
 print(f"✅ SUCCESS: Generated {len(df)} rows. Saved to CSV.")
 
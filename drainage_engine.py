@@ -0,0 +1,148 @@
+import numpy as np
+
+import site_layout as sl
+
+# --- CONFIGURATION ---
+RAINFALL_MM_HR = 50.0    # Design storm intensity (Pune, 2-year return)
+RUNOFF_COEFF = 0.9       # Industrial roofs & paving
+MANNING_N = 0.013        # Concrete pipe
+MANHOLE_SPACING = 30.0   # Max run between manholes (m)
+TRENCH_MARGIN = 0.3      # Working space each side of the pipe (m)
+MIN_COVER = 0.9          # Minimum soil cover over the crown (m)
+BEDDING = 0.15           # PCC bedding under the pipe (m)
+
+# Commercial diameters (m); pipes are never drawn below their nominal size
+STANDARD_DIAS = np.array([0.3, 0.45, 0.6, 0.8, 1.0, 1.2, 1.5, 1.8, 2.0, 2.5, 3.0, 3.5, 4.0])
+NOMINAL_DIA = np.array([sl.LATERAL_DIA, sl.LATERAL_DIA, sl.MAIN_DIA])  # indexed by kind
+
+# --- SECTION 1: HYDRAULICS ---
+
+def rational_flow(area_m2, rainfall=RAINFALL_MM_HR, runoff=RUNOFF_COEFF):
+    """Rational method Q = C.i.A (m3/s)"""
+    return runoff * (rainfall / 1000.0 / 3600.0) * np.asarray(area_m2, dtype=float)
+
+def full_bore_capacity(dia, slope):
+    """Manning full-bore flow (m3/s) of a circular pipe"""
+    dia = np.asarray(dia, dtype=float)
+    area = np.pi * dia**2 / 4
+    return area * (dia / 4) ** (2 / 3) * np.sqrt(slope) / MANNING_N
+
+def size_pipes(flow, slope, kind):
+    """Smallest standard diameter that carries the flow, never below nominal"""
+    # Invert Manning for D, then snap up to the catalogue
+    d_req = (np.asarray(flow) * MANNING_N * 4 ** (5 / 3) / (np.pi * np.sqrt(slope))) ** (3 / 8)
+    idx = np.searchsorted(STANDARD_DIAS, d_req - 1e-9)
+    over = idx >= len(STANDARD_DIAS)
+    dia = STANDARD_DIAS[np.minimum(idx, len(STANDARD_DIAS) - 1)]
+    dia = np.where(over, np.ceil(d_req * 10) / 10, dia)
+    return np.maximum(dia, NOMINAL_DIA[kind])
+
+# --- SECTION 2: NETWORK ENGINE ---
+
+def build_drainage_network(layout, rainfall=RAINFALL_MM_HR, runoff=RUNOFF_COEFF):
+    """Every feeder, street lateral & trunk segment of the estate in one pass"""
+    ox0, oy0, oz0 = layout['origin']
+    trunk = layout['trunk']
+    rows = layout['rows']
+    slope = sl.SLOPE_PCT / 100.0
+    pipe_y = layout['row_pipe_y']
+
+    # --- A. LATERALS (rows x runs) ---
+    # Each column element (lot or street) carries one run; sort so flow can accumulate
+    n_cols = len(layout['lot_x']) // max(rows, 1)
+    run_x = np.concatenate([layout['lot_x'][:n_cols], layout['street_x']])
+    run_len = np.concatenate([np.full(n_cols, layout['step_x_build']),
+                              np.full(len(layout['street_x']), sl.ROAD_WIDTH)])
+    order = np.argsort(run_x, kind='stable')
+    run_x, run_len = run_x[order], run_len[order]
+
+    # Feeder first (trunk -> site edge), then the street runs
+    x0 = np.concatenate([[trunk['x']], run_x])
+    x1 = np.concatenate([[ox0], run_x + run_len])
+    rise0 = np.concatenate([[0.0], (run_x - trunk['x']) * slope])
+    rise1 = np.concatenate([[sl.TRUNK_OFFSET * slope], (run_x + run_len - trunk['x']) * slope])
+    kind_row = np.concatenate([[sl.KIND_FEEDER], np.full(len(run_x), sl.KIND_STREET)])
+
+    # Each run drains the strip of its row; water flows back towards the trunk
+    catch_row = np.concatenate([[0.0], run_len * layout['step_y']])
+    cum_row = np.cumsum(catch_row[::-1])[::-1]
+    cum_row[0] = catch_row.sum()
+
+    # Levels relative to the trunk head for now; the head is set once pipes are sized
+    ratio = (trunk['start_y'] - pipe_y) / trunk['len']
+    z_row_start = -(trunk['drop'] * ratio)
+
+    n_seg = len(x0)
+    lat_y = np.repeat(pipe_y, n_seg)
+    lat_z0 = np.repeat(z_row_start, n_seg) + np.tile(rise0, rows)
+    lat_z1 = np.repeat(z_row_start, n_seg) + np.tile(rise1, rows)
+    lat_p0 = np.column_stack([np.tile(x0, rows), lat_y, lat_z0])
+    lat_p1 = np.column_stack([np.tile(x1, rows), lat_y, lat_z1])
+
+    # --- B. TRUNK (split at every row junction) ---
+    junction_y = np.sort(pipe_y)[::-1]
+    break_y = np.concatenate([[trunk['start_y']], junction_y, [trunk['end_y']]])
+    break_z = -trunk['drop'] * (trunk['start_y'] - break_y) / trunk['len']
+    row_catch = np.full(len(junction_y), catch_row.sum())
+    trunk_catch = np.concatenate([[0.0], np.cumsum(row_catch)])
+
+    trunk_p0 = np.column_stack([np.full(len(break_y) - 1, trunk['x']), break_y[:-1], break_z[:-1]])
+    trunk_p1 = np.column_stack([np.full(len(break_y) - 1, trunk['x']), break_y[1:], break_z[1:]])
+
+    # --- C. MERGE & SIZE ---
+    p0 = np.concatenate([lat_p0, trunk_p0])
+    p1 = np.concatenate([lat_p1, trunk_p1])
+    kind = np.concatenate([np.tile(kind_row, rows), np.full(len(trunk_p0), sl.KIND_TRUNK)])
+    row = np.concatenate([np.repeat(np.arange(rows), n_seg), np.full(len(trunk_p0), -1)])
+    catchment = np.concatenate([np.tile(cum_row, rows), trunk_catch])
+
+    length = np.linalg.norm(p1 - p0, axis=1)
+    seg_slope = np.abs(p1[:, 2] - p0[:, 2]) / np.where(length > 0, length, 1)
+    seg_slope = np.where(seg_slope > 0, seg_slope, slope)
+    flow = rational_flow(catchment, rainfall, runoff)
+    dia = size_pipes(flow, seg_slope, kind)
+
+    # Laterals rise away from the trunk: drop the trunk head (and every row with it)
+    # until the highest crown anywhere still has MIN_COVER, never above the nominal head
+    crown = np.maximum(p0[:, 2], p1[:, 2]) + dia / 2
+    z_head = min(trunk['z_top'], oz0 - MIN_COVER - crown.max())
+    p0[:, 2] += z_head
+    p1[:, 2] += z_head
+
+    # Trench: ground to centreline, half a pipe to the invert, then bedding
+    z_mid = (p0[:, 2] + p1[:, 2]) / 2
+    depth = oz0 - z_mid + dia / 2 + BEDDING
+    trench = length * (dia + 2 * TRENCH_MARGIN) * depth
+
+    # One manhole per MANHOLE_SPACING along each continuous run, plus one per junction
+    lat_run = np.bincount(row[kind != sl.KIND_TRUNK], weights=length[kind != sl.KIND_TRUNK], minlength=rows)
+    trunk_run = length[kind == sl.KIND_TRUNK].sum()
+    manholes = int(np.ceil(lat_run / MANHOLE_SPACING).sum() + np.ceil(trunk_run / MANHOLE_SPACING)) + rows
+
+    return {
+        'p0': p0, 'p1': p1, 'kind': kind, 'row': row,
+        'length': length, 'slope': seg_slope,
+        'z_start': p0[:, 2], 'z_end': p1[:, 2],  # Pipe centreline
+        'invert_start': p0[:, 2] - dia / 2, 'invert_end': p1[:, 2] - dia / 2,
+        'catchment_m2': catchment, 'flow_m3s': flow,
+        'dia': dia, 'capacity_m3s': full_bore_capacity(dia, seg_slope),
+        'trench_m3': trench,
+        'manholes': manholes,
+        'trunk_z_top': z_head, 'trunk_z_btm': z_head - trunk['drop'],
+    }
+
+# --- SECTION 3: BOQ ---
+
+def drainage_boq(network, rates=None):
+    """Drainage rows in the same shape as boq_data in scripts/3d_create.py"""
+    rate = {**sl.RATES, **(rates or {})}
+    kind, length, trench = network['kind'], network['length'], network['trench_m3']
+    is_main = kind == sl.KIND_TRUNK
+    return [
+        {"Category": "Infrastructure", "Item": "Main Trunk Sewer", "Unit": "m", "Qty": float(length[is_main].sum()), "Rate": rate["RATE_PIPE_MAIN"]},
+        {"Category": "Infrastructure", "Item": "Feeder Pipe", "Unit": "m", "Qty": float(length[kind == sl.KIND_FEEDER].sum()), "Rate": rate["RATE_PIPE_LAT"]},
+        {"Category": "Infrastructure", "Item": "Street Pipe", "Unit": "m", "Qty": float(length[kind == sl.KIND_STREET].sum()), "Rate": rate["RATE_PIPE_LAT"]},
+        {"Category": "Infrastructure", "Item": "Manhole", "Unit": "nos", "Qty": network['manholes'], "Rate": rate["RATE_MANHOLE"]},
+        {"Category": "Earthwork", "Item": "Trunk Excavation", "Unit": "m3", "Qty": float(trench[is_main].sum()), "Rate": rate["RATE_EXCAVATION"]},
+        {"Category": "Earthwork", "Item": "Trench Excavation", "Unit": "m3", "Qty": float(trench[~is_main].sum()), "Rate": rate["RATE_EXCAVATION"]},
+    ]
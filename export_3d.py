@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import struct
+import time
+
+import joblib
+import numpy as np
+
+import drainage_engine as de
+import site_layout as sl
+
+# --- CONFIGURATION ---
+BRAIN_PATH = "civil_ai_brain_rhino.pkl"
+CHUNK_BOXES = 65536  # Hexahedra written per chunk (bounds peak memory)
+
+# glTF is Y-up, the site is Z-up: rotate -90 deg about X
+Z_UP_TO_Y_UP = [-0.7071068, 0.0, 0.0, 0.7071068]
+
+# Unit shape each layer is instanced from (built by the same generators as the layers)
+TEMPLATES = {
+    "box": sl.box_corners(0, 0, 0, 1, 1, 1)[0],
+    "roof": sl.roof_corners(0, 0, 1, 1, 0, 1)[0],
+    "pipe": sl.pipe_corners(np.zeros((1, 3)), np.array([[1.0, 0.0, 0.0]]), 1.0)[0],
+}
+LAYER_TEMPLATES = {"AI_Drainage_Lat": "pipe", "AI_Drainage_Main": "pipe", "AI_Roof": "roof"}  # rest: box
+INSTANCING = "EXT_mesh_gpu_instancing"
+
+# --- SECTION 1: BUFFER HELPERS ---
+
+def _chunks(boxes):
+    for start in range(0, len(boxes), CHUNK_BOXES):
+        yield start, boxes[start:start + CHUNK_BOXES]
+
+def _chunk_indices(start, count, base=0):
+    """Instance the box template for boxes [start, start + count)"""
+    offsets = (base + 8 * np.arange(start, start + count, dtype=np.uint32))[:, None]
+    return (sl.BOX_TRIANGLES[None, :] + offsets).ravel()
+
+def _quaternions(R):
+    """(n, 3, 3) rotation matrices -> (n, 4) xyzw quaternions (branch on the largest term)"""
+    m00, m11, m22 = R[:, 0, 0], R[:, 1, 1], R[:, 2, 2]
+    terms = np.stack([m00 + m11 + m22, m00 - m11 - m22, m11 - m00 - m22, m22 - m00 - m11], axis=1)
+    case = terms.argmax(axis=1)
+    s = np.sqrt(np.maximum(terms[np.arange(len(R)), case] + 1.0, 1e-12)) * 2
+    a = (R[:, 2, 1] - R[:, 1, 2], R[:, 0, 2] - R[:, 2, 0], R[:, 1, 0] - R[:, 0, 1])  # antisymmetric
+    b = (R[:, 0, 1] + R[:, 1, 0], R[:, 0, 2] + R[:, 2, 0], R[:, 1, 2] + R[:, 2, 1])  # symmetric
+    q = np.select(
+        [case[:, None] == k for k in range(4)],
+        [np.stack([a[0], a[1], a[2], s * s / 4], axis=1),
+         np.stack([s * s / 4, b[0], b[1], a[0]], axis=1),
+         np.stack([b[0], s * s / 4, b[2], a[1]], axis=1),
+         np.stack([b[1], b[2], s * s / 4, a[2]], axis=1)],
+    ) / s[:, None]
+    return q
+
+def _instance_trs(boxes, template):
+    """Translation, rotation matrix & scale taking the unit template onto each hexahedron"""
+    # Affine map from three template edges to the same three edges of every box
+    t_edges = np.stack([template[1] - template[0], template[3] - template[0], template[4] - template[0]], axis=1)
+    edges = np.stack([boxes[:, 1] - boxes[:, 0], boxes[:, 3] - boxes[:, 0], boxes[:, 4] - boxes[:, 0]], axis=2)
+    A = edges @ np.linalg.inv(t_edges)
+
+    # Columns are orthogonal for every generator, so A = R . diag(scale); flat slabs get scale 0
+    s0 = np.linalg.norm(A[:, :, 0], axis=1)
+    s1 = np.linalg.norm(A[:, :, 1], axis=1)
+    r0, r1 = A[:, :, 0] / s0[:, None], A[:, :, 1] / s1[:, None]
+    r2 = np.cross(r0, r1)
+    s2 = np.einsum("ij,ij->i", A[:, :, 2], r2)
+    R = np.stack([r0, r1, r2], axis=2)
+    translation = boxes[:, 0] - A @ template[0]
+    return translation, R, np.column_stack([s0, s1, s2])
+
+def _instance_chunk(chunk, template, rotate):
+    """One interleaved record per instance: TRANSLATION, SCALE[, ROTATION]"""
+    t, R, scale = _instance_trs(chunk, template)
+    parts = [t, scale] + ([_quaternions(R)] if rotate else [])
+    return np.concatenate(parts, axis=1).astype("<f4")
+
+def _layer_items(layers):
+    colors = dict(sl.LAYERS)
+    for name, boxes in layers.items():
+        if len(boxes):
+            yield name, boxes, colors.get(name, [200, 200, 200])
+
+# --- SECTION 2: GLB (binary glTF 2.0) ---
+
+def write_glb(layers, path, instanced=True):
+    """One mesh per layer; header is planned from counts, buffers streamed after.
+
+    instanced: one unit shape per layer + per-instance TRS (EXT_mesh_gpu_instancing),
+    otherwise every box is baked into the layer's vertex buffer.
+    """
+    gltf = {
+        "asset": {"version": "2.0", "generator": "Generative Infrastructure Suite"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"name": "Site", "rotation": Z_UP_TO_Y_UP, "children": []}],
+        "meshes": [], "materials": [], "accessors": [], "bufferViews": [],
+        "buffers": [{"byteLength": 0}],
+    }
+    if instanced:
+        gltf["extensionsUsed"] = gltf["extensionsRequired"] = [INSTANCING]
+
+    offset = 0
+    items = list(_layer_items(layers))
+    for name, boxes, color in items:
+        n = len(boxes)
+        template = TEMPLATES[LAYER_TEMPLATES.get(name, "box")]
+        shape = template if instanced else boxes
+        n_verts = 8 if instanced else n * 8
+        n_idx = 36 if instanced else n * 36
+        pos_len, idx_len = n_verts * 12, n_idx * 4
+        gltf["bufferViews"] += [
+            {"buffer": 0, "byteOffset": offset, "byteLength": pos_len, "target": 34962},
+            {"buffer": 0, "byteOffset": offset + pos_len, "byteLength": idx_len, "target": 34963},
+        ]
+        offset += pos_len + idx_len
+
+        view = len(gltf["bufferViews"]) - 2
+        acc = len(gltf["accessors"])
+        gltf["accessors"] += [
+            {"bufferView": view, "componentType": 5126, "count": n_verts, "type": "VEC3",
+             "min": shape.reshape(-1, 3).min(axis=0).tolist(), "max": shape.reshape(-1, 3).max(axis=0).tolist()},
+            {"bufferView": view + 1, "componentType": 5125, "count": n_idx, "type": "SCALAR"},
+        ]
+        gltf["materials"].append({
+            "name": name,
+            "pbrMetallicRoughness": {"baseColorFactor": [c / 255.0 for c in color] + [1.0],
+                                     "metallicFactor": 0.0, "roughnessFactor": 0.9},
+            "doubleSided": True,
+        })
+        mesh = len(gltf["meshes"])
+        gltf["meshes"].append({"name": name, "primitives": [
+            {"attributes": {"POSITION": acc}, "indices": acc + 1, "material": mesh}]})
+        node = {"name": name, "mesh": mesh}
+
+        if instanced:
+            # Interleaved per-instance records: TRANSLATION, SCALE (+ ROTATION for pipes)
+            rotate = LAYER_TEMPLATES.get(name) == "pipe"
+            stride = 40 if rotate else 24
+            gltf["bufferViews"].append({"buffer": 0, "byteOffset": offset, "byteLength": n * stride, "byteStride": stride})
+            offset += n * stride
+            view = len(gltf["bufferViews"]) - 1
+            attrs = {"TRANSLATION": (0, "VEC3"), "SCALE": (12, "VEC3")}
+            if rotate:
+                attrs["ROTATION"] = (24, "VEC4")
+            node["extensions"] = {INSTANCING: {"attributes": {}}}
+            for attr, (byte_offset, kind) in attrs.items():
+                node["extensions"][INSTANCING]["attributes"][attr] = len(gltf["accessors"])
+                gltf["accessors"].append({"bufferView": view, "byteOffset": byte_offset,
+                                          "componentType": 5126, "count": n, "type": kind})
+
+        gltf["nodes"].append(node)
+        gltf["nodes"][0]["children"].append(len(gltf["nodes"]) - 1)
+
+    gltf["buffers"][0]["byteLength"] = offset
+    json_bytes = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+    total = 12 + 8 + len(json_bytes) + 8 + offset
+
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sII", b"glTF", 2, total))
+        f.write(struct.pack("<I4s", len(json_bytes), b"JSON"))
+        f.write(json_bytes)
+        f.write(struct.pack("<I4s", offset, b"BIN\x00"))
+        for name, boxes, _ in items:
+            kind = LAYER_TEMPLATES.get(name, "box")
+            if instanced:
+                f.write(TEMPLATES[kind].astype("<f4").tobytes())
+                f.write(sl.BOX_TRIANGLES.astype("<u4").tobytes())
+                for _, chunk in _chunks(boxes):
+                    f.write(_instance_chunk(chunk, TEMPLATES[kind], kind == "pipe").tobytes())
+                continue
+            for _, chunk in _chunks(boxes):
+                f.write(chunk.astype("<f4").tobytes())
+            for start, chunk in _chunks(boxes):
+                f.write(_chunk_indices(start, len(chunk)).astype("<u4").tobytes())
+    return total
+
+# --- SECTION 3: OBJ FALLBACK ---
+
+def write_obj(layers, path):
+    """Plain OBJ + MTL, one group per layer, streamed chunk by chunk"""
+    mtl_path = os.path.splitext(path)[0] + ".mtl"
+    items = list(_layer_items(layers))
+
+    with open(mtl_path, "w") as m:
+        for name, _, color in items:
+            r, g, b = [c / 255.0 for c in color]
+            m.write(f"newmtl {name}\nKd {r:.4f} {g:.4f} {b:.4f}\n\n")
+
+    base = 1  # OBJ indices are 1-based and global
+    with open(path, "w") as f:
+        f.write(f"mtllib {os.path.basename(mtl_path)}\n")
+        for name, boxes, _ in items:
+            f.write(f"o {name}\nusemtl {name}\n")
+            for start, chunk in _chunks(boxes):
+                verts = chunk.reshape(-1, 3)
+                f.write(("v %.3f %.3f %.3f\n" * len(verts)) % tuple(verts.ravel()))
+                faces = _chunk_indices(0, len(chunk), base + 8 * start)
+                f.write(("f %d %d %d\n" * (len(faces) // 3)) % tuple(faces.tolist()))
+            base += 8 * len(boxes)
+    return os.path.getsize(path) + os.path.getsize(mtl_path)
+
+# --- SECTION 4: CLI ---
+
+def export_site(path, site_w, site_d, base_soil="Murum", lot_w=sl.LOT_WIDTH, lot_d=sl.LOT_DEPTH, brain=None,
+                instanced=True):
+    layout = sl.build_site_layout(site_w, site_d, lot_w, lot_d)
+    soils = sl.assign_soils(layout, base_soil)
+    thick = sl.predict_thickness(brain, lot_w * lot_d, soils)
+    layers = sl.build_layers(layout, thick, de.build_drainage_network(layout))
+
+    if path.lower().endswith(".obj"):
+        size = write_obj(layers, path)
+    else:
+        size = write_glb(layers, path, instanced)
+    return len(thick), size
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a generated master plan to GLB / OBJ.")
+    parser.add_argument("out", help="Output file (.glb or .obj)")
+    parser.add_argument("--width", type=float, default=200.0, help="Site width (m)")
+    parser.add_argument("--depth", type=float, default=150.0, help="Site depth (m)")
+    parser.add_argument("--lot-width", type=float, default=sl.LOT_WIDTH)
+    parser.add_argument("--lot-depth", type=float, default=sl.LOT_DEPTH)
+    parser.add_argument("--soil", default="Murum", help="Base soil type")
+    parser.add_argument("--brain", default=BRAIN_PATH, help="Brain .pkl (rule-of-thumb if missing)")
+    parser.add_argument("--baked", action="store_true", help=f"GLB without {INSTANCING} (every box in the vertex buffer)")
+    args = parser.parse_args()
+
+    brain = joblib.load(args.brain) if os.path.exists(args.brain) else None
+    if brain is None:
+        print(f"⚠️  Brain '{args.brain}' not found, using rule-of-thumb thickness.")
+
+    t0 = time.perf_counter()
+    lots, size = export_site(args.out, args.width, args.depth, args.soil,
+                             args.lot_width, args.lot_depth, brain, not args.baked)
+    print(f"✅ Exported {lots} lots to {args.out} ({size / 1e6:.2f} MB) in {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+CAT = "category"  # Repeated strings are stored once, lots keep an int32 code
+
+# Text built from other fields only when the table is exported; the source fields
+# are storage only and are not exported themselves
+Derived = namedtuple("Derived", ["fmt", "sources"])
+
+# pune_civil_ai_master_data.csv (civil_ai_baseline.py)
+MASTER_SCHEMA = [
+    ("Scenario_ID", np.int32), ("Site_Size", CAT), ("Soil_Type", CAT), ("SBC", np.int32),
+    ("Color", CAT), ("N_Value", np.int32), ("GW_Depth", np.float64), ("Col_Load", np.int32),
+    ("Settlement_mm", np.float64), ("Seismic_Base_Shear_kN", np.float64), ("Hydrostatic_kPa", np.float64),
+    ("Concrete_m3", np.float64), ("Steel_kg", np.float64), ("Excavation_m3", np.float64),
+    ("Total_Project_Cost_INR", np.float64), ("Found_Type", CAT), ("Slab_Thickness_mm", np.float64),
+]
+
+# Civil_AI_Design_Log.csv (scripts/3d_create.py, boq_engine.py)
+DESIGN_SCHEMA = [
+    ("Building_ID", Derived("Row{}_Col{}", ("Row", "Col"))), ("Row", np.int32), ("Col", np.int32),
+    ("Soil_Type", CAT), ("SBC_Value", np.int32), ("AI_Thickness_mm", np.int32),
+    ("Excavation_Depth_m", np.float64), ("Concrete_Vol_m3", np.float64), ("Steel_Req_kg", np.int64),
+]
+
+def export_names(schema):
+    """Column names as exported (derived fields in place, their sources dropped)"""
+    hidden = {s for _, dtype in schema if isinstance(dtype, Derived) for s in dtype.sources}
+    return [name for name, _ in schema if name not in hidden]
+
+# --- SECTION 1: COLUMNAR LOT TABLE ---
+
+class LotTable:
+    """Lot records as one growable NumPy column per field instead of a dict per lot"""
+    __slots__ = ("schema", "columns", "categories", "derived", "_codes", "size")
+
+    def __init__(self, schema, capacity=1024):
+        self.schema = list(schema)
+        self.size = 0
+        self.derived = {name: dtype for name, dtype in self.schema if isinstance(dtype, Derived)}
+        self.categories = {name: [] for name, dtype in self.schema if dtype == CAT}
+        self._codes = {name: {} for name in self.categories}
+        self.columns = {
+            name: np.empty(capacity, dtype=np.int32 if dtype == CAT else dtype)
+            for name, dtype in self.schema if name not in self.derived
+        }
+
+    def __len__(self):
+        return self.size
+
+    def _code(self, name, value):
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self.categories[name].append(value)
+        return code
+
+    def _reserve(self, extra):
+        need = self.size + extra
+        capacity = len(next(iter(self.columns.values())))
+        if need <= capacity:
+            return
+        # Amortised doubling, like a list
+        capacity = max(need, capacity * 2)
+        for name, col in self.columns.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self.size] = col[:self.size]
+            self.columns[name] = grown
+
+    def _check(self, names):
+        if set(names) != set(self.columns):
+            missing = sorted(set(self.columns) - set(names))
+            extra = sorted(set(names) - set(self.columns))
+            raise KeyError(f"Lot record fields mismatch (missing={missing}, unknown={extra})")
+
+    def append(self, **values):
+        """One lot, e.g. append(Scenario_ID=0, **physics, **adv_phys, **costs, ...)"""
+        self._check(values)
+        self._reserve(1)
+        for name, value in values.items():
+            if name in self._codes:
+                value = self._code(name, value)
+            self.columns[name][self.size] = value
+        self.size += 1
+
+    def extend(self, **arrays):
+        """Many lots at once from equal-length arrays"""
+        self._check(arrays)
+        n = len(next(iter(arrays.values())))
+        self._reserve(n)
+        for name, values in arrays.items():
+            if name in self._codes:
+                values = [self._code(name, v) for v in values]
+            self.columns[name][self.size:self.size + n] = values
+        self.size += n
+
+    def nbytes(self):
+        """Column buffers plus the category tables behind them"""
+        total = sum(col[:self.size].nbytes for col in self.columns.values())
+        for name, values in self.categories.items():
+            total += sys.getsizeof(values) + sys.getsizeof(self._codes[name])
+            total += sum(sys.getsizeof(v) for v in values)
+        return total
+
+    # --- SECTION 2: EXPORT ---
+
+    def _derive(self, name):
+        fmt, sources = self.derived[name]
+        cols = [self.columns[s][:self.size].tolist() for s in sources]
+        return np.array([fmt.format(*v) for v in zip(*cols)], dtype=object)
+
+    def to_dataframe(self):
+        """Numeric columns are views of the table (no copy); text fields become Categoricals (codes copied)"""
+        data = {}
+        for name in export_names(self.schema):
+            if name in self.derived:
+                data[name] = self._derive(name)
+                continue
+            col = self.columns[name][:self.size]
+            if name in self._codes:
+                col = pd.Categorical.from_codes(col, self.categories[name])
+            data[name] = col
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self):
+        """pyarrow Table; numeric buffers are shared, text fields become dictionaries"""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("LotTable.to_arrow() needs pyarrow: pip install pyarrow") from None
+
+        names = export_names(self.schema)
+        arrays = []
+        for name in names:
+            if name in self.derived:
+                arrays.append(pa.array(self._derive(name).tolist(), type=pa.string()))
+                continue
+            col = self.columns[name][:self.size]
+            if name in self._codes:
+                arrays.append(pa.DictionaryArray.from_arrays(col, pa.array(self.categories[name])))
+            else:
+                arrays.append(pa.array(col))
+        return pa.table(arrays, names=names)
@@ -1,8 +1,11 @@
+import json
 import pandas as pd
 import joblib  # Standard library for saving ML models
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 
+import brain_profiles as bp
+
 # 1. Load Data
 df = pd.read_csv('pune_civil_ai_master_data.csv')
 
@@ -12,24 +15,37 @@ df['Derived_Area'] = df['Concrete_m3'] / (df['Slab_Thickness_mm'] / 1000)
 # 3. Encode Data
 le = LabelEncoder()
 df['Soil_Code'] = le.fit_transform(df['Soil_Type'])
+soil_map = dict(zip(le.classes_, range(len(le.classes_))))
 
-# 4. Train Model (Predicting Thickness AND Cost)
-# We will train two separate "Lobes" of the brain
+# 4. Train Models (Predicting Thickness AND Cost)
+# We will train two separate "Lobes" of the brain, once per speed/accuracy profile
 X = df[['Derived_Area', 'SBC', 'GW_Depth', 'Soil_Code']]
-
-model_cost = RandomForestRegressor(n_estimators=100)
-model_cost.fit(X, df['Total_Project_Cost_INR'])
-
-model_thick = RandomForestRegressor(n_estimators=100)
-model_thick.fit(X, df['Slab_Thickness_mm'])
-
-# 5. Save the "Brain" to a file
-brain_packet = {
-    'model_cost': model_cost,
-    'model_thick': model_thick,
-    'soil_encoder': le,
-    'soil_map': dict(zip(le.classes_, range(len(le.classes_))))
-}
-
+X_train, X_test, cost_train, cost_test, thick_train, thick_test = train_test_split(
+    X, df['Total_Project_Cost_INR'], df['Slab_Thickness_mm'], test_size=0.2, random_state=42)
+
+report = {"features": list(X.columns), "test_rows": len(X_test), "profiles": []}
+print(f"{'Profile':<10}{'R² thick':>10}{'R² cost':>10}{'1 row (ms)':>12}{'1k rows (ms)':>14}{'Size (KB)':>11}")
+
+for name, params in bp.PROFILES.items():
+    brain_packet = bp.train_profile(name, X_train, cost_train, thick_train)
+    brain_packet['soil_encoder'] = le
+    brain_packet['soil_map'] = soil_map
+
+    stats = bp.benchmark_brain(brain_packet, X_test, cost_test, thick_test)
+    path = bp.profile_path(name)
+    joblib.dump(brain_packet, path)
+    report["profiles"].append({"name": name, "path": path, **params, **stats})
+    print(f"{name:<10}{stats['r2_thick']:>10.6f}{stats['r2_cost']:>10.6f}"
+          f"{stats['row_ms']:>12.2f}{stats['batch_1k_ms']:>14.2f}{stats['pickle_kb']:>11.0f}")
+
+with open(bp.REPORT_PATH, "w") as f:
+    json.dump(report, f, indent=2)
+
+# 5. Save the "Brain" to a file (the unbounded forest, refit on ALL the data, stays the default brain)
+brain_packet = bp.train_profile("accurate", X, df['Total_Project_Cost_INR'], df['Slab_Thickness_mm'])
+brain_packet['soil_encoder'] = le
+brain_packet['soil_map'] = soil_map
 joblib.dump(brain_packet, 'civil_ai_brain.pkl')
-print("✅ Brain saved as 'civil_ai_brain.pkl'. Move this file to your Rhino folder.")
\ No newline at end of file
+
+print(f"✅ Brain saved as 'civil_ai_brain.pkl', profiles as 'civil_ai_brain_<profile>.pkl' ({bp.REPORT_PATH}).")
+print("   Move these files to your Rhino folder.")
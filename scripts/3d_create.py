@@ -2,54 +2,43 @@
 # r: pandas
 # r: scikit-learn
 # r: joblib
+# r: numpy
 
 import rhinoscriptsyntax as rs
 import joblib
 import pandas as pd
 import os
+import sys
+
+# Shared engines live in the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import site_layout as sl
+import drainage_engine as de
+import brain_profiles as bp
+import site_tiles as stl
+from lot_records import LotTable, DESIGN_SCHEMA
 
 # --- CONFIGURATION ---
 BRAIN_PATH = r"D:\Archi\civil_ai_brain_rhino.pkl" 
 COST_PATH = r"D:\Archi\Civil_AI_BOQ_Cost.csv"
 DESIGN_PATH = r"D:\Archi\Civil_AI_Design_Log.csv"
+PROFILE_REPORT = r"D:\Archi\civil_ai_brain_profiles.json"
+LATENCY_BUDGET_MS = 20.0  # Per-lot predict budget used to pick a brain profile
 
-# Layout
-LOT_WIDTH = 40.0   
-LOT_DEPTH = 30.0   
-ROAD_WIDTH = 12.0  
-SIDEWALK_WIDTH = 4.0 
-
-REAR_SETBACK = 6.0    
-SIDE_GAP = 5.0        
-BLOCK_SIZE = 3        
-
-# Infrastructure
-LATERAL_DIA = 0.8  
-MAIN_DIA = 3.0     
-POND_RADIUS = 25.0 
-SLOPE_PCT = 1.5    
-
-# Detailed Rates (INR)
-RATE_EXCAVATION = 350.0   
-RATE_BACKFILLING = 200.0  
-RATE_PCC = 4500.0         
-RATE_RCC_M25 = 7500.0     
-RATE_STEEL = 85.0         
-KG_STEEL_PER_M3 = 110.0   
-
-RATE_ROAD_BASE = 850.0    
-RATE_ROAD_ASPHALT = 650.0 
-RATE_PAVER_BLOCK = 900.0  
-
-RATE_PIPE_LAT = 2800.0    
-RATE_PIPE_MAIN = 8500.0   
-RATE_MANHOLE = 18000.0    
+# Layout, infrastructure & rates come from site_layout so the grid, the pipes
+# and the BOQ can never disagree (edit them there)
+from site_layout import (
+    LOT_WIDTH, LOT_DEPTH, ROAD_WIDTH, SIDEWALK_WIDTH, REAR_SETBACK, SIDE_GAP, BLOCK_SIZE,
+    POND_RADIUS,
+    RATE_EXCAVATION, RATE_RCC_M25, RATE_STEEL, KG_STEEL_PER_M3, RATE_ROAD_ASPHALT,
+)
 
 def load_brain():
-    if not os.path.exists(BRAIN_PATH):
+    brain_path = bp.brain_path_for_budget(LATENCY_BUDGET_MS, PROFILE_REPORT, default=BRAIN_PATH)
+    if not os.path.exists(brain_path):
         rs.MessageBox("Brain file missing!", 0, "Error")
         return None
-    return joblib.load(BRAIN_PATH)
+    return joblib.load(brain_path)
 
 def get_soil_name_interactive(brain, prompt_text="Select Soil Type"):
     original_keys = list(brain['soil_map'].keys())
@@ -121,10 +110,15 @@ def civil_ai_master_suite():
             center = [(z_rect[0].X + z_rect[2].X)/2, (z_rect[0].Y + z_rect[2].Y)/2, origin[2]]
             rs.AddTextDot(zone_soil, center)
 
+    # Large estates: only tiles touching this region get full 3D, the rest footprints
+    detail_rect = None
+    if rs.GetString("Limit full detail to a region?", "No", strings=["Yes", "No"]) == "Yes":
+        detail_rect = rs.GetRectangle(1)
+
     # 4. GENERATE
     rs.EnableRedraw(False)
     boq_data = []      # For Cost Report
-    design_log = []    # For Technical Report
+    design_log = LotTable(DESIGN_SCHEMA)    # For Technical Report
 
     step_x_build = LOT_WIDTH + SIDE_GAP
     step_y = ROAD_WIDTH + SIDEWALK_WIDTH + LOT_DEPTH + REAR_SETBACK
@@ -133,25 +127,24 @@ def civil_ai_master_suite():
     print("🏗️  Processing Engineering Calculations...")
 
     # --- A. INFRASTRUCTURE ---
-    rs.CurrentLayer("AI_Drainage_Main")
-    trunk_x = origin[0] - 15.0 
-    trunk_start_y = origin[1] + site_d + 10
-    trunk_end_y = origin[1] - 20
-    trunk_len = abs(trunk_start_y - trunk_end_y)
-    trunk_drop = trunk_len * (SLOPE_PCT / 100.0)
-    z_trunk_top = origin[2] - 4.0
-    z_trunk_btm = z_trunk_top - trunk_drop 
-    
-    main_crv = rs.AddLine([trunk_x, trunk_start_y, z_trunk_top], [trunk_x, trunk_end_y, z_trunk_btm])
-    rs.AddPipe(main_crv, 0, MAIN_DIA, cap=0)
-    rs.DeleteObject(main_crv)
-    
-    boq_data.append({"Category": "Infrastructure", "Item": "Main Trunk Sewer", "Unit": "m", "Qty": trunk_len, "Rate": RATE_PIPE_MAIN})
-    trunk_excav = trunk_len * 5.0 * 4.0
-    boq_data.append({"Category": "Earthwork", "Item": "Trunk Excavation", "Unit": "m3", "Qty": trunk_excav, "Rate": RATE_EXCAVATION})
+    # Whole drainage network (inverts, flows, pipe sizes) in one vectorized pass
+    layout = sl.build_site_layout(site_w, site_d, LOT_WIDTH, LOT_DEPTH, origin)
+    network = de.build_drainage_network(layout)
+    trunk = layout['trunk']
+    in_detail = dict(zip(zip(layout['lot_row'].tolist(), layout['lot_col'].tolist()),
+                         stl.detail_lots(layout, detail_rect).tolist()))
+    trunk_x = trunk['x']
+    z_trunk_btm = network['trunk_z_btm']
+
+    for p0, p1, kind, dia in zip(network['p0'], network['p1'], network['kind'], network['dia']):
+        rs.CurrentLayer("AI_Drainage_Main" if kind == sl.KIND_TRUNK else "AI_Drainage_Lat")
+        seg_crv = rs.AddLine(p0.tolist(), p1.tolist())
+        rs.AddPipe(seg_crv, 0, float(dia) / 2, cap=0)  # radius
+        rs.DeleteObject(seg_crv)
+    boq_data.extend(de.drainage_boq(network))
 
     rs.CurrentLayer("AI_Water_Pond")
-    pond_center = [trunk_x, trunk_end_y - POND_RADIUS, 0]
+    pond_center = [trunk_x, trunk['end_y'] - POND_RADIUS, 0]
     rs.AddCylinder([pond_center[0], pond_center[1], z_trunk_btm - 2], 3.0, POND_RADIUS)
     pond_vol = 3.14 * (POND_RADIUS**2) * 5.0
     boq_data.append({"Category": "Earthwork", "Item": "Pond Excavation", "Unit": "m3", "Qty": pond_vol, "Rate": RATE_EXCAVATION})
@@ -162,19 +155,6 @@ def civil_ai_master_suite():
         road_y_start = block_y
         sidewalk_y_start = road_y_start + ROAD_WIDTH
         building_y_start = sidewalk_y_start + SIDEWALK_WIDTH
-        pipe_y = sidewalk_y_start + (SIDEWALK_WIDTH / 2)
-        
-        ratio = (trunk_start_y - pipe_y) / trunk_len
-        z_row_start = z_trunk_top - (trunk_drop * ratio)
-
-        # Feeder Pipe
-        rs.CurrentLayer("AI_Drainage_Lat")
-        rise_feeder = 15.0 * (SLOPE_PCT / 100.0)
-        z_city_start = z_row_start + rise_feeder
-        feeder_pipe = rs.AddLine([trunk_x, pipe_y, z_row_start], [origin[0], pipe_y, z_city_start])
-        rs.AddPipe(feeder_pipe, 0, LATERAL_DIA, cap=0)
-        rs.DeleteObject(feeder_pipe)
-        boq_data.append({"Category": "Infrastructure", "Item": "Feeder Pipe", "Unit": "m", "Qty": 15.0, "Rate": RATE_PIPE_LAT})
 
         current_x = origin[0]
         col_count = 0
@@ -185,16 +165,6 @@ def civil_ai_master_suite():
             if col_count > 0 and col_count % BLOCK_SIZE == 0:
                 rs.CurrentLayer("AI_Roads")
                 rs.AddSrfPt([[current_x, origin[1], origin[2]], [current_x + ROAD_WIDTH, origin[1], origin[2]], [current_x + ROAD_WIDTH, origin[1] + site_d, origin[2]], [current_x, origin[1] + site_d, origin[2]]])
-                
-                rs.CurrentLayer("AI_Drainage_Lat")
-                dist_x = current_x - trunk_x
-                rise_start = dist_x * (SLOPE_PCT / 100.0)
-                rise_end = (dist_x + ROAD_WIDTH) * (SLOPE_PCT / 100.0)
-                bridge_pipe = rs.AddLine([current_x, pipe_y, z_row_start + rise_start], 
-                                         [current_x + ROAD_WIDTH, pipe_y, z_row_start + rise_end])
-                rs.AddPipe(bridge_pipe, 0, LATERAL_DIA, cap=0)
-                rs.DeleteObject(bridge_pipe)
-                boq_data.append({"Category": "Infrastructure", "Item": "Street Pipe", "Unit": "m", "Qty": ROAD_WIDTH, "Rate": RATE_PIPE_LAT})
 
                 current_x += ROAD_WIDTH 
                 col_count += 1 
@@ -215,16 +185,6 @@ def civil_ai_master_suite():
             rs.CurrentLayer("AI_Utility_Corridor")
             rs.AddSrfPt([[ox, sidewalk_y_start, oz], [ox + step_x_build, sidewalk_y_start, oz], [ox + step_x_build, building_y_start, oz], [ox, building_y_start, oz]])
             
-            # Pipe
-            rs.CurrentLayer("AI_Drainage_Lat")
-            dist_x = ox - trunk_x
-            z_pipe_start = z_row_start + (dist_x * (SLOPE_PCT / 100.0))
-            z_pipe_end = z_row_start + ((dist_x + step_x_build) * (SLOPE_PCT / 100.0))
-            seg_crv = rs.AddLine([ox, pipe_y, z_pipe_start], [ox + step_x_build, pipe_y, z_pipe_end])
-            rs.AddPipe(seg_crv, 0, LATERAL_DIA, cap=0)
-            rs.DeleteObject(seg_crv)
-            boq_data.append({"Category": "Infrastructure", "Item": "Street Pipe", "Unit": "m", "Qty": step_x_build, "Rate": RATE_PIPE_LAT})
-            
             # --- AI BUILDING ---
             center_pt = [ox + LOT_WIDTH/2, oy + LOT_DEPTH/2, oz]
             current_soil = base_soil
@@ -240,16 +200,20 @@ def civil_ai_master_suite():
             input_df = pd.DataFrame([{ 'Derived_Area': LOT_WIDTH * LOT_DEPTH, 'SBC': sbc, 'GW_Depth': 5.0, 'Soil_Code': soil_code }])
             pred_thick = brain['model_thick'].predict(input_df)[0] / 1000.0
             
-            # Geometry
-            layer = "AI_Fdn_Bad" if pred_thick > 0.8 else "AI_Fdn_Good"
-            rs.CurrentLayer(layer)
-            rs.AddBox([[ox, oy, oz], [ox+LOT_WIDTH, oy, oz], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz], [ox, oy+LOT_DEPTH, oz], [ox, oy, oz-pred_thick], [ox+LOT_WIDTH, oy, oz-pred_thick], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz-pred_thick], [ox, oy+LOT_DEPTH, oz-pred_thick]])
-            rs.CurrentLayer("AI_Buildings")
-            rs.AddBox([[ox, oy, oz], [ox+LOT_WIDTH, oy, oz], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz], [ox, oy+LOT_DEPTH, oz], [ox, oy, oz+6.0], [ox+LOT_WIDTH, oy, oz+6.0], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz+6.0], [ox, oy+LOT_DEPTH, oz+6.0]])
-            rs.CurrentLayer("AI_Roof")
-            mid_y = oy + (LOT_DEPTH/2)
-            rs.AddSrfPt([[ox, oy, oz+6], [ox+LOT_WIDTH, oy, oz+6], [ox+LOT_WIDTH, mid_y, oz+8.5], [ox, mid_y, oz+8.5]]) 
-            rs.AddSrfPt([[ox, mid_y, oz+8.5], [ox+LOT_WIDTH, mid_y, oz+8.5], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz+6], [ox, oy+LOT_DEPTH, oz+6]]) 
+            # Geometry (full detail only inside the selected tiles)
+            if in_detail.get((r, col_count), True):
+                layer = "AI_Fdn_Bad" if pred_thick > 0.8 else "AI_Fdn_Good"
+                rs.CurrentLayer(layer)
+                rs.AddBox([[ox, oy, oz], [ox+LOT_WIDTH, oy, oz], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz], [ox, oy+LOT_DEPTH, oz], [ox, oy, oz-pred_thick], [ox+LOT_WIDTH, oy, oz-pred_thick], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz-pred_thick], [ox, oy+LOT_DEPTH, oz-pred_thick]])
+                rs.CurrentLayer("AI_Buildings")
+                rs.AddBox([[ox, oy, oz], [ox+LOT_WIDTH, oy, oz], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz], [ox, oy+LOT_DEPTH, oz], [ox, oy, oz+6.0], [ox+LOT_WIDTH, oy, oz+6.0], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz+6.0], [ox, oy+LOT_DEPTH, oz+6.0]])
+                rs.CurrentLayer("AI_Roof")
+                mid_y = oy + (LOT_DEPTH/2)
+                rs.AddSrfPt([[ox, oy, oz+6], [ox+LOT_WIDTH, oy, oz+6], [ox+LOT_WIDTH, mid_y, oz+8.5], [ox, mid_y, oz+8.5]]) 
+                rs.AddSrfPt([[ox, mid_y, oz+8.5], [ox+LOT_WIDTH, mid_y, oz+8.5], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz+6], [ox, oy+LOT_DEPTH, oz+6]]) 
+            else:
+                rs.CurrentLayer("AI_Buildings")
+                rs.AddPolyline([[ox, oy, oz], [ox+LOT_WIDTH, oy, oz], [ox+LOT_WIDTH, oy+LOT_DEPTH, oz], [ox, oy+LOT_DEPTH, oz], [ox, oy, oz]])
 
             # --- CALCULATIONS ---
             # 1. Quantities
@@ -263,15 +227,16 @@ def civil_ai_master_suite():
             boq_data.append({"Category": "Earthwork", "Item": "Excavation", "Unit": "m3", "Qty": pit_vol, "Rate": RATE_EXCAVATION})
             
             # 3. Add to Design Log (Technical Report)
-            design_log.append({
-                "Building_ID": f"Row{r+1}_Col{col_count+1}",
-                "Soil_Type": current_soil,
-                "SBC_Value": sbc,
-                "AI_Thickness_mm": int(pred_thick * 1000),
-                "Excavation_Depth_m": round(pred_thick + 0.15, 2),
-                "Concrete_Vol_m3": round(rcc_vol, 1),
-                "Steel_Req_kg": int(steel_kg)
-            })
+            design_log.append(
+                Row=r + 1,
+                Col=col_count + 1,
+                Soil_Type=current_soil,
+                SBC_Value=sbc,
+                AI_Thickness_mm=int(pred_thick * 1000),
+                Excavation_Depth_m=round(pred_thick + 0.15, 2),
+                Concrete_Vol_m3=round(rcc_vol, 1),
+                Steel_Req_kg=int(steel_kg)
+            )
 
             current_x += step_x_build
             col_count += 1
@@ -287,7 +252,7 @@ def civil_ai_master_suite():
     summary.to_csv(COST_PATH, index=False)
     
     # 2. DESIGN LOG
-    df_log = pd.DataFrame(design_log)
+    df_log = design_log.to_dataframe()
     df_log.to_csv(DESIGN_PATH, index=False)
     
     rs.MessageBox(f"✅ PROJECT COMPLETE\n\n1. BOQ Cost Report: {COST_PATH}\n2. Design Log: {DESIGN_PATH}", 0, "Success")
@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+# Single source for scripts/3d_create.py and the headless engines, so both always match
+
+# Layout
+LOT_WIDTH = 40.0
+LOT_DEPTH = 30.0
+ROAD_WIDTH = 12.0
+SIDEWALK_WIDTH = 4.0
+
+REAR_SETBACK = 6.0
+SIDE_GAP = 5.0
+BLOCK_SIZE = 3
+
+BUILDING_HEIGHT = 6.0
+RIDGE_HEIGHT = 8.5
+
+# Infrastructure
+LATERAL_DIA = 0.8
+MAIN_DIA = 3.0
+SLOPE_PCT = 1.5
+TRUNK_OFFSET = 15.0
+POND_RADIUS = 25.0
+
+# Detailed Rates (INR)
+RATE_EXCAVATION = 350.0
+RATE_BACKFILLING = 200.0
+RATE_PCC = 4500.0
+RATE_RCC_M25 = 7500.0
+RATE_STEEL = 85.0
+KG_STEEL_PER_M3 = 110.0
+
+RATE_ROAD_BASE = 850.0
+RATE_ROAD_ASPHALT = 650.0
+RATE_PAVER_BLOCK = 900.0
+
+RATE_PIPE_LAT = 2800.0
+RATE_PIPE_MAIN = 8500.0
+RATE_MANHOLE = 18000.0
+
+# Default rate card; batch quotes may override any entry by name
+RATES = {
+    "RATE_EXCAVATION": RATE_EXCAVATION, "RATE_BACKFILLING": RATE_BACKFILLING,
+    "RATE_PCC": RATE_PCC, "RATE_RCC_M25": RATE_RCC_M25, "RATE_STEEL": RATE_STEEL,
+    "RATE_ROAD_BASE": RATE_ROAD_BASE, "RATE_ROAD_ASPHALT": RATE_ROAD_ASPHALT,
+    "RATE_PAVER_BLOCK": RATE_PAVER_BLOCK,
+    "RATE_PIPE_LAT": RATE_PIPE_LAT, "RATE_PIPE_MAIN": RATE_PIPE_MAIN, "RATE_MANHOLE": RATE_MANHOLE,
+}
+
+# Drainage segment kinds
+KIND_FEEDER = 0
+KIND_STREET = 1
+KIND_TRUNK = 2
+
+# Rhino layer names & colours (same order as the Rhino suite)
+LAYERS = [
+    ("AI_Roads", [50, 50, 50]),
+    ("AI_Utility_Corridor", [180, 180, 180]),
+    ("AI_Drainage_Lat", [0, 150, 255]),
+    ("AI_Drainage_Main", [0, 0, 139]),
+    ("AI_Fdn_Good", [50, 200, 50]),
+    ("AI_Fdn_Bad", [200, 50, 50]),
+    ("AI_Buildings", [200, 200, 200]),
+    ("AI_Roof", [150, 150, 150]),
+]
+
+# --- SECTION 1: SOIL & AI HELPERS ---
+
+def sbc_for_soil(soil_names):
+    """Same SBC rule as the Rhino script, for an array of soil names"""
+    s_check = np.asarray(soil_names, dtype=str)
+    sbc = np.full(s_check.shape, 250, dtype=np.int64)
+    sbc[np.char.find(s_check, "Cotton") >= 0] = 80
+    sbc[np.char.find(s_check, "Rock") >= 0] = 600
+    return sbc
+
+def assign_soils(layout, base_soil, special_zones=()):
+    """Soil per lot centre; later zones win, like reversed() in the Rhino loop"""
+    cx = layout['lot_x'] + layout['lot_w'] / 2
+    cy = layout['lot_y'] + layout['lot_d'] / 2
+    soils = np.full(len(cx), base_soil, dtype=object)
+
+    for corners, s_name in special_zones:
+        xs = [p[0] for p in corners]
+        ys = [p[1] for p in corners]
+        inside = (cx >= min(xs)) & (cx <= max(xs)) & (cy >= min(ys)) & (cy <= max(ys))
+        soils[inside] = s_name
+    return soils
+
+def predict_thickness(brain, area, soils, gw_depth=5.0):
+    """Foundation thickness (m) for every lot in ONE forest call"""
+    soils = np.asarray(soils, dtype=object)
+    sbc = sbc_for_soil(soils)
+    if not brain:
+        # Same rule-of-thumb fallback as app.py
+        return np.where(sbc < 100, 1.2, 0.4)
+
+    soil_map = brain['soil_map']
+    input_df = pd.DataFrame({
+        'Derived_Area': np.broadcast_to(np.asarray(area, dtype=float), soils.shape),
+        'SBC': sbc,
+        'GW_Depth': np.broadcast_to(np.asarray(gw_depth, dtype=float), soils.shape),
+        'Soil_Code': [soil_map.get(s, 0) for s in soils],
+    })
+    return brain['model_thick'].predict(input_df) / 1000.0
+
+# --- SECTION 2: LAYOUT ENGINE ---
+
+def build_site_layout(site_w, site_d, lot_w=LOT_WIDTH, lot_d=LOT_DEPTH, origin=(0.0, 0.0, 0.0)):
+    """Grid of scripts/3d_create.py as flat NumPy arrays (no Rhino needed)"""
+    ox0, oy0, oz0 = origin
+    step_x_build = lot_w + SIDE_GAP
+    step_y = ROAD_WIDTH + SIDEWALK_WIDTH + lot_d + REAR_SETBACK
+    if step_x_build <= 0 or step_y <= 0:
+        # The column walk below would never reach the site edge
+        raise ValueError(f"Lot {lot_w} x {lot_d} m gives a non-positive grid step")
+    rows = int(site_d / step_y)
+
+    # The column sequence is identical for every row, so walk it once
+    lot_cols, lot_x, street_x = [], [], []
+    current_x = ox0
+    col_count = 0
+    while current_x < (ox0 + site_w - step_x_build):
+        if col_count > 0 and col_count % BLOCK_SIZE == 0:
+            street_x.append(current_x)
+            current_x += ROAD_WIDTH
+        else:
+            lot_cols.append(col_count)
+            lot_x.append(current_x)
+            current_x += step_x_build
+        col_count += 1
+
+    # Per-row strips
+    road_y = oy0 + np.arange(rows) * step_y
+    sidewalk_y = road_y + ROAD_WIDTH
+    building_y = sidewalk_y + SIDEWALK_WIDTH
+    pipe_y = sidewalk_y + (SIDEWALK_WIDTH / 2)
+
+    # Broadcast columns over rows (row-major, same order as the Rhino loop)
+    n_cols = len(lot_x)
+    lot_row = np.repeat(np.arange(rows), n_cols)
+    lot_col = np.tile(np.asarray(lot_cols, dtype=np.int64), rows)
+
+    # Main trunk
+    trunk_x = ox0 - TRUNK_OFFSET
+    trunk_start_y = oy0 + site_d + 10
+    trunk_end_y = oy0 - 20
+    trunk_len = abs(trunk_start_y - trunk_end_y)
+    trunk_drop = trunk_len * (SLOPE_PCT / 100.0)
+    z_trunk_top = oz0 - 4.0
+
+    return {
+        'site_w': site_w, 'site_d': site_d, 'origin': (ox0, oy0, oz0),
+        'lot_w': lot_w, 'lot_d': lot_d, 'rows': rows,
+        'step_x_build': step_x_build, 'step_y': step_y,
+        'lot_row': lot_row,
+        'lot_col': lot_col,
+        'lot_x': np.tile(np.asarray(lot_x, dtype=float), rows),
+        'lot_y': np.repeat(building_y, n_cols),
+        'street_x': np.asarray(street_x, dtype=float),
+        'row_road_y': road_y,
+        'row_sidewalk_y': sidewalk_y,
+        'row_pipe_y': pipe_y,
+        'trunk': {
+            'x': trunk_x, 'start_y': trunk_start_y, 'end_y': trunk_end_y,
+            'len': trunk_len, 'drop': trunk_drop,
+            'z_top': z_trunk_top, 'z_btm': z_trunk_top - trunk_drop,
+        },
+    }
+
+# --- SECTION 3: GEOMETRY (8-corner hexahedra per layer) ---
+
+# 12 triangles of one hexahedron (corners 0-3 bottom ring, 4-7 top ring)
+BOX_TRIANGLES = np.array([
+    0, 2, 1, 0, 3, 2,   # bottom
+    4, 5, 6, 4, 6, 7,   # top
+    0, 1, 5, 0, 5, 4,   # sides
+    1, 2, 6, 1, 6, 5,
+    2, 3, 7, 2, 7, 6,
+    3, 0, 4, 3, 4, 7,
+], dtype=np.uint32)
+
+def box_corners(x0, y0, z0, x1, y1, z1):
+    """(n, 8, 3) corners; bottom ring then top ring, like rs.AddBox"""
+    x0, y0, z0, x1, y1, z1 = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (x0, y0, z0, x1, y1, z1)])
+    xs = np.stack([x0, x1, x1, x0, x0, x1, x1, x0], axis=-1)
+    ys = np.stack([y0, y0, y1, y1, y0, y0, y1, y1], axis=-1)
+    zs = np.stack([z0, z0, z0, z0, z1, z1, z1, z1], axis=-1)
+    return np.stack([xs, ys, zs], axis=-1).reshape(-1, 8, 3)
+
+def pipe_corners(p0, p1, dia):
+    """Square-section prism along each segment (Rhino draws a round pipe)"""
+    half = np.broadcast_to(np.asarray(dia, dtype=float), (len(p0),)).reshape(-1, 1) / 2
+    d = p1 - p0
+    # Horizontal normal of the run; vertical runs fall back to +X
+    side = np.column_stack([-d[:, 1], d[:, 0], np.zeros(len(d))])
+    norm = np.linalg.norm(side, axis=1, keepdims=True)
+    side = np.where(norm > 0, side / np.where(norm > 0, norm, 1), [1.0, 0.0, 0.0])
+    # Square to the pipe axis (not plumb), so every pipe is a rotated + scaled unit prism
+    axis = d / np.linalg.norm(d, axis=1, keepdims=True)
+    up = np.cross(axis, side) * half
+    side = side * half
+
+    # Ring at the start, then the same ring at the end (caps = bottom/top faces)
+    ring = [-side - up, side - up, side + up, -side + up]
+    return np.stack([p0 + off for off in ring] + [p1 + off for off in ring], axis=1)
+
+def roof_corners(x0, y0, x1, y1, z_eave, z_ridge):
+    """Gable roof as a hexahedron whose top ring collapses onto the ridge"""
+    out = box_corners(x0, y0, z_eave, x1, y1, z_ridge)
+    mid_y = (np.asarray(y0, dtype=float) + y1) / 2
+    out[:, 4:, 1] = np.asarray(mid_y).reshape(-1, 1)
+    return out
+
+def build_layers(layout, thick, network):
+    """All estate geometry grouped by Rhino layer name (network from drainage_engine)"""
+    ox0, oy0, oz = layout['origin']
+    lx, ly = layout['lot_x'], layout['lot_y']
+    lw, ld = layout['lot_w'], layout['lot_d']
+    step = layout['step_x_build']
+    road_y = np.repeat(layout['row_road_y'], len(lx) // max(layout['rows'], 1))
+    thick = np.asarray(thick, dtype=float)
+
+    # Horizontal roads & sidewalks are laid per lot; vertical streets span the site
+    roads = np.concatenate([
+        box_corners(lx, road_y, oz, lx + step, road_y + ROAD_WIDTH, oz),
+        box_corners(layout['street_x'], oy0, oz, layout['street_x'] + ROAD_WIDTH, oy0 + layout['site_d'], oz),
+    ])
+    sidewalks = box_corners(lx, road_y + ROAD_WIDTH, oz, lx + step, ly, oz)
+
+    fdn = box_corners(lx, ly, oz - thick, lx + lw, ly + ld, oz)
+    bad = thick > 0.8
+
+    is_main = network['kind'] == KIND_TRUNK
+    pipes = pipe_corners(network['p0'], network['p1'], network['dia'])
+
+    return {
+        "AI_Roads": roads,
+        "AI_Utility_Corridor": sidewalks,
+        "AI_Drainage_Lat": pipes[~is_main],
+        "AI_Drainage_Main": pipes[is_main],
+        "AI_Fdn_Good": fdn[~bad],
+        "AI_Fdn_Bad": fdn[bad],
+        "AI_Buildings": box_corners(lx, ly, oz, lx + lw, ly + ld, oz + BUILDING_HEIGHT),
+        "AI_Roof": roof_corners(lx, ly, lx + lw, ly + ld, oz + BUILDING_HEIGHT, oz + RIDGE_HEIGHT),
+    }
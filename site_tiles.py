@@ -0,0 +1,102 @@
+import numpy as np
+
+import site_layout as sl
+
+# --- CONFIGURATION ---
+ROWS_PER_BAND = 2   # Lot rows per tile band (tile = row band x block between cross streets)
+GLOBAL_TILE = -1    # Pieces longer than a band (cross streets) are shared by every tile
+FOOTPRINT_TRIANGLES = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+# Drawn flat outside the detail region so the estate stays readable (roads & sidewalks are flat anyway)
+FOOTPRINT_LAYERS = ("AI_Roads", "AI_Utility_Corridor", "AI_Buildings")
+
+# --- SECTION 1: PARTITION ---
+
+def tile_grid(layout):
+    """(bands, groups) of the estate"""
+    n_bands = max(int(np.ceil(layout['rows'] / ROWS_PER_BAND)), 1)
+    return n_bands, len(layout['street_x']) + 1
+
+def tile_ids(layout, x, y):
+    """Tile index of plan points: row band x BLOCK_SIZE group"""
+    n_bands, n_groups = tile_grid(layout)
+    band_h = layout['step_y'] * ROWS_PER_BAND
+    band = np.clip(np.floor((np.asarray(y) - layout['origin'][1]) / band_h).astype(int), 0, n_bands - 1)
+    group = np.searchsorted(layout['street_x'], np.asarray(x), side='right')
+    return band * n_groups + group
+
+def build_tiles(layout, layers):
+    """Re-order every layer's hexahedra so each tile is one contiguous buffer"""
+    n_bands, n_groups = tile_grid(layout)
+    n_tiles = n_bands * n_groups
+    band_h = layout['step_y'] * ROWS_PER_BAND
+    bounds = np.tile([np.inf, np.inf, -np.inf, -np.inf], (n_tiles, 1))
+
+    tiled = {}
+    for name, boxes in layers.items():
+        lo, hi = boxes.min(axis=1), boxes.max(axis=1)
+        centre = (lo + hi) / 2
+        tile = tile_ids(layout, centre[:, 0], centre[:, 1])
+        tile = np.where(hi[:, 1] - lo[:, 1] > band_h, GLOBAL_TILE, tile)
+
+        local = tile != GLOBAL_TILE
+        np.minimum.at(bounds[:, 0], tile[local], lo[local, 0])
+        np.minimum.at(bounds[:, 1], tile[local], lo[local, 1])
+        np.maximum.at(bounds[:, 2], tile[local], hi[local, 0])
+        np.maximum.at(bounds[:, 3], tile[local], hi[local, 1])
+
+        # Key 0 = global pieces, key t + 1 = tile t
+        order = np.argsort(tile, kind='stable')
+        starts = np.searchsorted(tile[order] + 1, np.arange(n_tiles + 2))
+        tiled[name] = {'boxes': boxes[order], 'starts': starts}
+
+    return {'n_tiles': n_tiles, 'n_bands': n_bands, 'n_groups': n_groups,
+            'bounds': bounds, 'layers': tiled}
+
+def tiles_in_region(tiles, x0, y0, x1, y1):
+    """Tiles whose plan bounds touch the rectangle"""
+    b = tiles['bounds']
+    hit = (b[:, 0] <= max(x0, x1)) & (b[:, 2] >= min(x0, x1)) & (b[:, 1] <= max(y0, y1)) & (b[:, 3] >= min(y0, y1))
+    return np.flatnonzero(hit)
+
+def detail_lots(layout, corners=None):
+    """Per-lot flag: is the lot's tile touched by the region (no region = everything)"""
+    lx, ly = layout['lot_x'], layout['lot_y']
+    lw, ld = layout['lot_w'], layout['lot_d']
+    if corners is None:
+        return np.ones(len(lx), dtype=bool)
+
+    xs = [p[0] for p in corners]
+    ys = [p[1] for p in corners]
+    touch = (lx <= max(xs)) & (lx + lw >= min(xs)) & (ly <= max(ys)) & (ly + ld >= min(ys))
+    lot_tile = tile_ids(layout, lx + lw / 2, ly + ld / 2)
+    return np.isin(lot_tile, lot_tile[touch])
+
+# --- SECTION 2: MESH BUFFERS ---
+
+def _gather(entry, keys):
+    starts = entry['starts']
+    parts = [entry['boxes'][starts[k]:starts[k + 1]] for k in keys]
+    return np.concatenate(parts) if parts else entry['boxes'][:0]
+
+def detail_mesh(tiles, selected):
+    """Full-detail (vertices, triangles) per layer for the selected tiles (+ global pieces)"""
+    keys = [0] + [int(t) + 1 for t in selected]
+    out = {}
+    for name, entry in tiles['layers'].items():
+        boxes = _gather(entry, keys)
+        if len(boxes):
+            faces = sl.BOX_TRIANGLES[None, :] + 8 * np.arange(len(boxes), dtype=np.uint32)[:, None]
+            out[name] = (boxes.reshape(-1, 3), faces.reshape(-1, 3))
+    return out
+
+def footprint_mesh(tiles, selected, layers=FOOTPRINT_LAYERS):
+    """Flat outlines (2 triangles per piece) per layer for the tiles NOT selected"""
+    rest = np.setdiff1d(np.arange(tiles['n_tiles']), selected)
+    keys = [int(t) + 1 for t in rest]
+    out = {}
+    for name in layers:
+        boxes = _gather(tiles['layers'][name], keys)
+        if len(boxes):
+            faces = FOOTPRINT_TRIANGLES[None, :] + 4 * np.arange(len(boxes), dtype=np.uint32)[:, None]
+            out[name] = (boxes[:, :4].reshape(-1, 3), faces.reshape(-1, 3))
+    return out